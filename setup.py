@@ -58,6 +58,7 @@ setup(
                             "PySimpleGUI27>=2.2.0;python_version<'3.0'",
                             #"typing;python_version<='3.4'", # PySimpleGUI on Python2 needed this...
                             "PyMuPDF>=1.14.5",],
+                    "mupdf": ["PyMuPDF>=1.19.6",], # For the '--backend mupdf' option.
                     },
     url="https://github.com/abarker/pdfCropMargins",
     entry_points = {
@@ -33,6 +33,8 @@ import os
 import glob
 import shutil
 import time
+import multiprocessing
+from multiprocessing.pool import ThreadPool
 from . import external_program_calls as ex
 
 #
@@ -55,22 +57,30 @@ args = None # Command-line arguments; set in get_bounding_box_list.
 page_nums_to_crop = None # Set of pages to crop.
 PdfFileWriter = None
 
+# The maximum number of external rendering processes run at the same time.  Each
+# one parses the whole PDF file, so the memory used grows with the count.
+MAX_RENDER_PROCESSES = 4
+
+# Timeout in seconds for the wait on the rendering processes.  The wait is only
+# interruptible by Ctrl-C on Python 2 when it has a timeout.
+RENDER_WAIT_TIMEOUT = 24 * 60 * 60
+
 #
 # The main functions of the module.
 #
 
-def get_bounding_box_list(input_doc_fname, input_doc, full_page_box_list,
+def get_bounding_box_list(input_doc_fname, full_page_box_list,
                        set_of_page_nums_to_crop, argparse_args, chosen_PdfFileWriter):
     """Calculate a bounding box for each page in the document.  The  `input_doc_fname`
-    argument is the filename of the document's original PDF file, the second is
-    the PdfFileReader for the document.  The argument full_page_box_list is a list
-    of the full-page-size boxes (which is used to correct for any nonzero origins
-    in the PDF coordinates).  The set_of_page_nums_to_crop argument is the set of page
-    numbers to crop; it is passed so that unnecessary calculations can be
-    skipped.  The argparse_args argument should be passed the args parsed from
-    the command line by argparse.  The chosen_PdfFileWriter is the PdfFileWriter
-    class from whichever pyPdf package was chosen by the main program.  The
-    function returns the list of bounding boxes."""
+    argument is the filename of the document's original PDF file.  The argument
+    full_page_box_list is a list of the full-page-size boxes (which is used to
+    convert the rendered image sizes to PDF units and to correct for any nonzero
+    origins in the PDF coordinates).  The set_of_page_nums_to_crop argument is
+    the set of page numbers to crop; it is passed so that unnecessary
+    calculations can be skipped.  The argparse_args argument should be passed
+    the args parsed from the command line by argparse.  The chosen_PdfFileWriter
+    is the PdfFileWriter class from whichever pyPdf package was chosen by the
+    main program.  The function returns the list of bounding boxes."""
     global args, page_nums_to_crop, PdfFileWriter
     args = argparse_args # Make args available to all funs in module, as a global.
     page_nums_to_crop = set_of_page_nums_to_crop # Make the set of pages global, too.
@@ -88,7 +98,8 @@ def get_bounding_box_list(input_doc_fname, input_doc, full_page_box_list,
                   "\npackage or use the Ghostscript flag '--gsBbox' (or '-gs') if you"
                   "\nhave Ghostscript installed.", file=sys.stderr)
             ex.cleanup_and_exit(1)
-        bbox_list = get_bounding_box_list_render_image(input_doc_fname, input_doc)
+        bbox_list = get_bounding_box_list_render_image(input_doc_fname,
+                                                       full_page_box_list)
 
     # Now we need to use the full page boxes to translate for non-zero origin.
     bbox_list = correct_bounding_box_list_for_nonzero_origin(bbox_list,
@@ -113,10 +124,11 @@ def correct_bounding_box_list_for_nonzero_origin(bbox_list, full_box_list):
     return corrected_box_list
 
 
-def get_bounding_box_list_render_image(pdf_file_name, input_doc):
+def get_bounding_box_list_render_image(pdf_file_name, full_page_box_list):
     """Calculate the bounding box list by directly rendering each page of the PDF as
-    an image file.  The MediaBox and CropBox values in input_doc should have
-    already been set to the chosen page size before the rendering."""
+    an image file.  The MediaBox and CropBox values in the PDF file should have
+    already been set to the chosen page sizes, given in full_page_box_list, before
+    the rendering."""
 
     program_to_use = "pdftoppm" # default to pdftoppm
     if args.gsRender:
@@ -137,7 +149,8 @@ def get_bounding_box_list_render_image(pdf_file_name, input_doc):
               "\nthis may take a while...")
 
     # Do the rendering of all the files.
-    render_pdf_file_to_image_files(pdf_file_name, temp_image_file_root, program_to_use)
+    render_pdf_file_to_image_files(pdf_file_name, temp_image_file_root, program_to_use,
+                                   len(full_page_box_list))
 
     # Currently assuming that sorting the output will always put them in correct order.
     outfiles = sorted(glob.glob(temp_image_file_root + "*"))
@@ -150,8 +163,6 @@ def get_bounding_box_list_render_image(pdf_file_name, input_doc):
     bounding_box_list = []
 
     for page_num, tmp_image_file_name in enumerate(outfiles):
-        curr_page = input_doc.getPage(page_num)
-
         # Open the image in PIL.  Retry a few times on fail in case race conditions.
         max_num_tries = 3
         time_between_tries = 1
@@ -199,7 +210,8 @@ def get_bounding_box_list_render_image(pdf_file_name, input_doc):
             im.show() # usually for debugging or param-setting
 
         # Calculate the bounding box of the negative image, and append to list.
-        bounding_box = calculate_bounding_box_from_image(im, curr_page)
+        bounding_box = calculate_bounding_box_from_image(im,
+                                                         full_page_box_list[page_num])
         bounding_box_list.append(bounding_box)
 
         # Clean up the image files after they are no longer needed.
@@ -210,40 +222,91 @@ def get_bounding_box_list_render_image(pdf_file_name, input_doc):
         print()
     return bounding_box_list
 
-def render_pdf_file_to_image_files(pdf_file_name, output_filename_root, program_to_use):
+def render_pdf_file_to_image_files(pdf_file_name, output_filename_root, program_to_use,
+                                   num_pages):
     """Render all the pages of the PDF file at pdf_file_name to image files with
     path and filename prefix given by output_filename_root.  Any directories must
     have already been created, and the calling program is responsible for
     deleting any directories or image files.  The program program_to_use,
     currently either the string "pdftoppm" or the string "Ghostscript", will be
     called externally.  The image type that the PDF is converted into must to be
-    directly openable by PIL."""
+    directly openable by PIL.
+
+    The pages render independently, so the document is split into contiguous
+    page ranges (one per CPU, up to MAX_RENDER_PROCESSES) which are rendered by
+    concurrent runs of the external program.  Each range gets its own numbered
+    filename prefix, so the sorted image filenames are still in page order."""
 
     res_x = str(args.resX)
     res_y = str(args.resY)
     if program_to_use == "Ghostscript":
         if ex.system_os == "Windows": # Windows PIL is more likely to know BMP
-            ex.render_pdf_file_to_image_files__ghostscript_bmp(
-                                  pdf_file_name, output_filename_root, res_x, res_y)
+            render_fun = ex.render_pdf_file_to_image_files__ghostscript_bmp
         else: # Linux and Cygwin should be fine with PNG
-            ex.render_pdf_file_to_image_files__ghostscript_png(
-                                  pdf_file_name, output_filename_root, res_x, res_y)
+            render_fun = ex.render_pdf_file_to_image_files__ghostscript_png
+        page_range_args = lambda first, last: ["-dFirstPage=" + str(first),
+                                               "-dLastPage=" + str(last)]
     elif program_to_use == "pdftoppm":
         use_gray = False # this is currently hardcoded, but can be changed to use pgm
         if use_gray:
-            ex.render_pdf_file_to_image_files_pdftoppm_pgm(
-                pdf_file_name, output_filename_root, res_x, res_y)
+            render_fun = ex.render_pdf_file_to_image_files_pdftoppm_pgm
         else:
-            ex.render_pdf_file_to_image_files_pdftoppm_ppm(
-                pdf_file_name, output_filename_root, res_x, res_y)
+            render_fun = ex.render_pdf_file_to_image_files_pdftoppm_ppm
+        page_range_args = lambda first, last: ["-f", str(first), "-l", str(last)]
     else:
         print("Error in renderPdfFileToImageFile: Unrecognized external program.",
               file=sys.stderr)
         ex.cleanup_and_exit(1)
 
-def calculate_bounding_box_from_image(im, curr_page):
+    page_ranges = get_render_page_ranges(num_pages)
+    if len(page_ranges) <= 1:
+        render_fun(pdf_file_name, output_filename_root, res_x, res_y)
+        return
+
+    def render_page_range(range_num):
+        first, last = page_ranges[range_num]
+        render_fun(pdf_file_name, output_filename_root + "{:04d}".format(range_num),
+                   res_x, res_y, page_range_args(first, last))
+
+    # Threads are enough here since they only wait on the external processes.
+    pool = ThreadPool(len(page_ranges))
+    try:
+        pool.map_async(render_page_range,
+                       range(len(page_ranges))).get(RENDER_WAIT_TIMEOUT)
+    except multiprocessing.TimeoutError:
+        print("\nError in pdfCropMargins: Rendering the PDF file to images did not"
+              "\nfinish within {} seconds.".format(RENDER_WAIT_TIMEOUT),
+              file=sys.stderr)
+        ex.cleanup_and_exit(1)
+    except:
+        # Wait for the renders of the other page ranges to stop before the caller
+        # deletes the temp directory they write to (on Ctrl-C they are interrupted
+        # too, so this is quick).
+        pool.terminate()
+        raise
+    pool.close()
+    pool.join()
+
+def get_render_page_ranges(num_pages):
+    """Split the pages into at most one contiguous range per CPU (and at most
+    MAX_RENDER_PROCESSES ranges), returning a list of (first, last) tuples of page
+    numbers counted from one."""
+    try:
+        num_cpus = multiprocessing.cpu_count()
+    except NotImplementedError:
+        num_cpus = 1
+    num_ranges = min(num_cpus, MAX_RENDER_PROCESSES, num_pages)
+    page_ranges = []
+    first = 1
+    for range_num in range(num_ranges):
+        last = first + (num_pages - first + 1) // (num_ranges - range_num) - 1
+        page_ranges.append((first, last))
+        first = last + 1
+    return page_ranges
+
+def calculate_bounding_box_from_image(im, full_page_box):
     """This function uses a PIL routine to get the bounding box of the rendered
-    image."""
+    image.  The full_page_box is the lbrt box the page was rendered from."""
     x_max, y_max = im.size
     bounding_box = im.getbbox() # note this uses ltrb convention
     if not bounding_box:
@@ -257,13 +320,9 @@ def calculate_bounding_box_from_image(im, curr_page):
     bounding_box[1] = y_max - bounding_box[1]
     bounding_box[3] = y_max - bounding_box[3]
 
-    full_page_box = curr_page.mediaBox # should have been set already to chosen box
-
     # Convert pixel units to PDF's bp units.
-    convert_x = float(full_page_box.getUpperRight_x()
-                     - full_page_box.getLowerLeft_x()) / x_max
-    convert_y = float(full_page_box.getUpperRight_y()
-                     - full_page_box.getLowerLeft_y()) / y_max
+    convert_x = float(full_page_box[2] - full_page_box[0]) / x_max
+    convert_y = float(full_page_box[3] - full_page_box[1]) / y_max
 
     # Get final box; note conversion to lower-left point, upper-right point format.
     final_box = [
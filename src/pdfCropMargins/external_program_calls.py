@@ -31,6 +31,7 @@ from __future__ import print_function, division, absolute_import
 import sys
 import os
 import subprocess
+import shlex
 import tempfile
 import glob
 import shutil
@@ -604,24 +605,31 @@ def render_pdf_file_to_image_files_pdftoppm_ppm(pdf_file_name, root_output_file_
     return comm_output
 
 def render_pdf_file_to_image_files_pdftoppm_pgm(pdf_file_name, root_output_file_path,
-                                           res_x=150, res_y=150):
+                                           res_x=150, res_y=150, extra_args=None):
     """Same as renderPdfFileToImageFile_pdftoppm_ppm but with -gray option for pgm."""
+    if extra_args is None:
+        extra_args = []
 
     comm_output = render_pdf_file_to_image_files_pdftoppm_ppm(pdf_file_name,
-                                        root_output_file_path, res_x, res_y, ["-gray"])
+                             root_output_file_path, res_x, res_y, ["-gray"] + extra_args)
     return comm_output
 
 def render_pdf_file_to_image_files__ghostscript_png(pdf_file_name,
                                                     root_output_file_path,
-                                                    res_x=150, res_y=150):
+                                                    res_x=150, res_y=150,
+                                                    extra_args=None):
     """Use Ghostscript to render a PDF file to .png images.  The `root_output_file_path`
     is prepended to all the output files, which have numbers and extensions added.
-    Return the command output."""
+    Extra arguments can be passed as a list in extra_args.  Return the command
+    output."""
+    if extra_args is None:
+        extra_args = []
+
     # For gs commands see
     # http://ghostscript.com/doc/current/Devices.htm#File_formats
     # http://ghostscript.com/doc/current/Devices.htm#PNG
     if not gs_executable: init_and_test_gs_executable(exit_on_fail=True)
-    command = [gs_executable, "-dBATCH", "-dNOPAUSE", "-sDEVICE=pnggray",
+    command = [gs_executable, "-dBATCH", "-dNOPAUSE", "-sDEVICE=pnggray"] + extra_args + [
                "-r"+res_x+"x"+res_y, "-sOutputFile="+root_output_file_path+"-%06d.png",
                pdf_file_name]
     comm_output = get_external_subprocess_output(command, env=gs_environment)
@@ -629,17 +637,22 @@ def render_pdf_file_to_image_files__ghostscript_png(pdf_file_name,
 
 def render_pdf_file_to_image_files__ghostscript_bmp(pdf_file_name,
                                                     root_output_file_path,
-                                                    res_x=150, res_y=150):
+                                                    res_x=150, res_y=150,
+                                                    extra_args=None):
     """Use Ghostscript to render a PDF file to .bmp images.  The `root_output_file_path`
     is prepended to all the output files, which have numbers and extensions added.
-    Return the command output."""
+    Extra arguments can be passed as a list in extra_args.  Return the command
+    output."""
+    if extra_args is None:
+        extra_args = []
+
     # For gs commands see
     # http://ghostscript.com/doc/current/Devices.htm#File_formats
     # http://ghostscript.com/doc/current/Devices.htm#BMP
     # These are the BMP devices:
     #    bmpmono bmpgray bmpsep1 bmpsep8 bmp16 bmp256 bmp16m bmp32b
     if not gs_executable: init_and_test_gs_executable(exit_on_fail=True)
-    command = [gs_executable, "-dBATCH", "-dNOPAUSE", "-sDEVICE=bmpgray",
+    command = [gs_executable, "-dBATCH", "-dNOPAUSE", "-sDEVICE=bmpgray"] + extra_args + [
                "-r"+res_x+"x"+res_y, "-sOutputFile="+root_output_file_path+"-%06d.bmp",
                pdf_file_name]
     comm_output = get_external_subprocess_output(command, env=gs_environment)
@@ -651,11 +664,20 @@ def render_pdf_file_to_image_files__ghostscript_bmp(pdf_file_name,
 ##
 
 def show_preview(viewer_path, pdf_file_name):
-    """Run the PDF viewer at the path viewer_path on the file pdf_file_name."""
+    """Run the PDF viewer at the path viewer_path on the file pdf_file_name.  If
+    viewer_path is not an existing file it is split like a shell command line
+    (except on Windows), so options can be passed to the viewer.  No shell is
+    run, so the filename never needs quoting."""
     try:
-        cmd = [viewer_path, pdf_file_name]
+        if os.path.exists(viewer_path) or system_os == "Windows":
+            viewer_cmd = [viewer_path]
+        else:
+            viewer_cmd = shlex.split(viewer_path) # Raises ValueError on bad quoting.
+        if not viewer_cmd:
+            raise ValueError("empty viewer command")
+        cmd = viewer_cmd + [pdf_file_name]
         run_external_subprocess_in_background(cmd)
-    except (subprocess.CalledProcessError, OSError, IOError) as e:
+    except (subprocess.CalledProcessError, OSError, IOError, ValueError) as e:
         print("\nWarning from pdfCropMargins: The argument to the '--viewer' option:"
               "\n   ", viewer_path, "\nwas not found or failed to execute correctly.\n",
               file=sys.stderr)
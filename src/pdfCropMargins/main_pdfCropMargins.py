@@ -49,8 +49,12 @@ Source code site: https://github.com/abarker/pdfCropMargins
 from __future__ import print_function, division, absolute_import
 import sys
 import os
+import io
+import re
 import shutil
 import time
+import heapq
+from functools import reduce
 
 from . import __version__ # Get the version number from the __init__.py file.
 from .manpage_data import cmd_parser, DEFAULT_THRESHOLD_VALUE
@@ -78,6 +82,31 @@ from .calculate_bounding_boxes import get_bounding_box_list
 # The string which is appended to Producer metadata in cropped PDFs.
 PRODUCER_MODIFIER = " (Cropped by pdfCropMargins.)"
 
+# The document info keys copied over to the cropped PDF, paired with the metadata
+# attributes holding their values.  The Producer key is set separately.
+METADATA_KEYS = [(NameObject("/Author"), "author"),
+                 (NameObject("/Creator"), "creator"),
+                 (NameObject("/Subject"), "subject"),
+                 (NameObject("/Title"), "title")]
+PRODUCER_KEY = NameObject("/Producer")
+
+# The pyPdf page attributes for the boxes selected by the letters of the
+# '--fullPageBox' option.  The MediaBox and CropBox are read from the copies saved
+# before they are reset to the full-page box.
+FULL_PAGE_BOX_ATTRIBUTES = {"m": "originalMediaBox", "c": "originalCropBox",
+                            "t": "trimBox", "a": "artBox", "b": "bleedBox"}
+
+# Buffer size for the files written by pyPdf, which writes in many small pieces.
+WRITE_BUFFER_SIZE = 1 << 20 # 1 MiB
+
+# Regexes for page range specifiers like "4-5,7,9".  The first one matches a full
+# valid specifier, and the second one finds the (left, right) pairs within it,
+# with right empty for a single page.  Whitespace is allowed around the numbers,
+# and the numbers can have a leading plus sign (as accepted by int).
+PAGE_RANGE_SPEC_REGEX = re.compile(
+        r"\s*\+?\d+\s*(-\s*\+?\d+\s*)?(,\s*\+?\d+\s*(-\s*\+?\d+\s*)?)*$")
+PAGE_RANGE_REGEX = re.compile(r"(\+?\d+)\s*(?:-\s*(\+?\d+))?")
+
 args = None # Global set during cmd-line processing (since almost all funs use it).
 
 ##
@@ -107,21 +136,23 @@ def generate_default_filename(infile_path, is_cropped_file=True):
 def parse_page_range_specifiers(spec_string, all_page_nums):
     """Parse a page range specifier argument such as "4-5,7,9".  Passed
     a specifier and the set of all page numbers, it returns the subset."""
+    # Check the full format first, since findall just skips over anything invalid.
+    if not PAGE_RANGE_SPEC_REGEX.match(spec_string):
+        raise ValueError
+
     page_nums_to_crop = set() # Note that this set holds page num MINUS ONE, start at 0.
-    for page_num_or_range in spec_string.split(","):
-        split_range = page_num_or_range.split("-")
-        if len(split_range) == 1:
-            # Note pyPdf page nums start at 0, not 1 like usual PDF pages,
-            # subtract 1.
-            page_nums_to_crop.add(int(split_range[0])-1)
-        else:
-            left_arg = int(split_range[0])-1
-            right_arg = int(split_range[1])
-            if left_arg >= right_arg:
-                print("Error in pdfCropMargins: left argument of range cannot be less"
-                      " than the right one.", file=sys.stderr)
-                raise ValueError
-            page_nums_to_crop.update(set(range(left_arg, right_arg)))
+    for left_arg, right_arg in PAGE_RANGE_REGEX.findall(spec_string):
+        # Note pyPdf page nums start at 0, not 1 like usual PDF pages, subtract 1.
+        left_arg = int(left_arg)-1
+        if not right_arg:
+            page_nums_to_crop.add(left_arg)
+            continue
+        right_arg = int(right_arg)
+        if left_arg >= right_arg:
+            print("Error in pdfCropMargins: left argument of range cannot be less"
+                  " than the right one.", file=sys.stderr)
+            raise ValueError
+        page_nums_to_crop.update(range(left_arg, right_arg))
     page_nums_to_crop = page_nums_to_crop & all_page_nums # intersect chosen with actual
     return page_nums_to_crop
 
@@ -148,18 +179,51 @@ def parse_page_ratio_argument(ratio_arg):
         raise ValueError
     return float_ratio
 
+def get_page_nums_to_crop(num_pages):
+    """Return the set of page numbers (starting at zero) of the pages selected for
+    cropping by the '--pages' option, out of the `num_pages` pages in the
+    document.  All pages are selected when the option is not set."""
+    all_page_nums = set(range(0, num_pages))
+    if args.pages:
+        try:
+            page_nums_to_crop = parse_page_range_specifiers(args.pages, all_page_nums)
+        except ValueError:
+            print(
+                "\nError in pdfCropMargins: The page range specified on the command",
+                "\nline contains a non-integer value or otherwise cannot be parsed.",
+                file=sys.stderr)
+            ex.cleanup_and_exit(1)
+    else:
+        page_nums_to_crop = all_page_nums
+
+    # In verbose mode print out information about the pages to crop.
+    if args.verbose and args.pages:
+        p_num_list = sorted(page_nums_to_crop)
+        # Print the page numbers (numbering from 1) in rows of ten with one write.
+        rows = ["  ".join("%5d" % (p_num+1) for p_num in p_num_list[i:i+10])
+                for i in range(0, len(p_num_list), 10)]
+        print("\nThese pages of the document will be cropped:\n   "
+              + "\n   ".join(rows))
+    elif args.verbose:
+        print("\nAll the pages of the document will be cropped.")
+    return page_nums_to_crop
+
+def intersect_lbrt_boxes(box1, box2):
+    """Return the intersection of two boxes in the PDF (lbrt) format, as a list.
+    Any sequences of four numbers can be passed in, including pyPdf boxes."""
+    # Unpack the values once.  Note [llx,lly,urx,ury] == [l,b,r,t].
+    left1, bottom1, right1, top1 = box1
+    left2, bottom2, right2, top2 = box2
+    return [max(left1, left2), max(bottom1, bottom2),
+            min(right1, right2), min(top1, top2)]
+
 def intersect_boxes(box1, box2):
     """Takes two pyPdf boxes (such as page.mediaBox) and returns the pyPdf
     box which is their intersection."""
     if not box1 and not box2: return None
     if not box1: return box2
     if not box2: return box1
-    intersect = RectangleObject([0, 0, 0, 0]) # Note [llx,lly,urx,ury] == [l,b,r,t]
-    intersect.upperRight = (min(box1.upperRight[0], box2.upperRight[0]),
-                            min(box1.upperRight[1], box2.upperRight[1]))
-    intersect.lowerLeft = (max(box1.lowerLeft[0], box2.lowerLeft[0]),
-                           max(box1.lowerLeft[1], box2.lowerLeft[1]))
-    return intersect
+    return RectangleObject(intersect_lbrt_boxes(box1, box2))
 
 def mod_box_for_rotation(box, angle, undo=False):
     """The user sees left, bottom, right, and top margins on a page, but inside
@@ -185,6 +249,14 @@ def mod_box_for_rotation(box, angle, undo=False):
     else:
         return rotate_ninety_degrees_clockwise(box, undo_map[angle])
 
+def apply_absolute_precrop(box, rotation):
+    """Do any absolute pre-cropping specified for a page (after modifying any
+    absolutePreCrop4 arguments to take into account rotations to the page).  The
+    `box` argument is in lbrt format, and a list of four floats is returned."""
+    precrop_box = mod_box_for_rotation(args.absolutePreCrop4, rotation)
+    return [float(box[0]) + precrop_box[0], float(box[1]) + precrop_box[1],
+            float(box[2]) - precrop_box[2], float(box[3]) - precrop_box[3]]
+
 def get_full_page_box_assigning_media_and_crop(page, skip_pre_crop=False):
     """This returns whatever PDF box was selected (by the user option
     '--fullPageBox') to represent the full page size.  All cropping is done
@@ -193,7 +265,7 @@ def get_full_page_box_assigning_media_and_crop(page, skip_pre_crop=False):
     argument page should be a pyPdf page object.  This function also by default
     sets the MediaBox and CropBox to the full-page size and saves the old values
     in the same page namespace, and so it should only be called once for each
-    page.  It returns a RectangleObject box."""
+    page.  It returns the box as a list of four floats, in lbrt format."""
     # Note skip_pre_crop option isn't used, may or may not be useful.
 
     # Find the page rotation angle (degrees).
@@ -216,41 +288,33 @@ def get_full_page_box_assigning_media_and_crop(page, skip_pre_crop=False):
     page.originalMediaBox = page.mediaBox
     page.originalCropBox = page.cropBox
 
-    first_loop = True
-    for box_string in args.fullPageBox:
-        if box_string == "m": f_box = page.mediaBox
-        if box_string == "c": f_box = page.cropBox
-        if box_string == "t": f_box = page.trimBox
-        if box_string == "a": f_box = page.artBox
-        if box_string == "b": f_box = page.bleedBox
-
-        # Take intersection over all chosen boxes.
-        if first_loop:
-            full_box = f_box
-        else:
-            full_box = intersect_boxes(full_box, f_box)
+    # Get each chosen box, reusing the MediaBox and CropBox just looked up above
+    # (each lookup resolves the box from the page dictionary).
+    chosen_boxes = [getattr(page, FULL_PAGE_BOX_ATTRIBUTES[box_string])
+                    for box_string in args.fullPageBox]
 
-        first_loop = False
+    # Take intersection over all chosen boxes.  A single box is returned as-is.
+    full_box = reduce(intersect_boxes, chosen_boxes)
 
-    if not skip_pre_crop:
-        # Do any absolute pre-cropping specified for the page (after modifying any
-        # absolutePreCrop4 arguments to take into account rotations to the page).
-        precrop_box = mod_box_for_rotation(args.absolutePreCrop4, rotation)
-        full_box = RectangleObject([float(full_box.lowerLeft[0]) + precrop_box[0],
-                                    float(full_box.lowerLeft[1]) + precrop_box[1],
-                                    float(full_box.upperRight[0]) - precrop_box[2],
-                                    float(full_box.upperRight[1]) - precrop_box[3]])
+    # The float list is returned directly, so the boxes are only converted from
+    # the pyPdf number objects once.
+    if skip_pre_crop:
+        float_box = [float(b) for b in full_box]
+    else:
+        float_box = apply_absolute_precrop(full_box, rotation)
+        full_box = RectangleObject(float_box)
 
     page.mediaBox = full_box
     page.cropBox = full_box
 
-    return full_box
+    return float_box
 
-def get_full_page_box_list_assigning_media_and_crop(input_doc, quiet=False,
+def get_full_page_box_list_assigning_media_and_crop(input_doc_pages, quiet=False,
                                                     skip_pre_crop=False):
     """Get a list of all the full-page box values for each page.  The argument
-    input_doc should be a `PdfFileReader` object.  The boxes on the list are in the
-    simple 4-float list format used by this program, not `RectangleObject` format."""
+    input_doc_pages should be the list of page objects of a `PdfFileReader`.  The
+    boxes on the list are in the simple 4-float list format used by this program,
+    not `RectangleObject` format."""
 
     full_page_box_list = []
     rotation_list = []
@@ -258,10 +322,9 @@ def get_full_page_box_list_assigning_media_and_crop(input_doc, quiet=False,
     if args.verbose and not quiet:
         print("\nOriginal full page sizes, in PDF format (lbrt):")
 
-    for page_num in range(input_doc.getNumPages()):
+    for page_num, curr_page in enumerate(input_doc_pages):
 
-        # Get the current page and find the full-page box.
-        curr_page = input_doc.getPage(page_num)
+        # Find the full-page box of the current page.
         full_page_box = get_full_page_box_assigning_media_and_crop(curr_page,
                                                                    skip_pre_crop)
 
@@ -270,15 +333,22 @@ def get_full_page_box_list_assigning_media_and_crop(input_doc, quiet=False,
             print("\t"+str(page_num+1), "  rot =",
                   curr_page.rotationAngle, "\t", full_page_box)
 
-        # Convert the RectangleObject to floats in an ordinary list and append.
-        ordinary_box = [float(b) for b in full_page_box]
-        full_page_box_list.append(ordinary_box)
+        full_page_box_list.append(full_page_box)
 
         # Append the rotation value to the rotation_list.
         rotation_list.append(curr_page.rotationAngle)
 
     return full_page_box_list, rotation_list
 
+def get_page_crop_mask(page_nums_to_crop, num_pages):
+    """Return a bytearray of length `num_pages` which is nonzero at the index of
+    each page number in the set `page_nums_to_crop`.  Indexing it is a cheaper
+    membership test than a set lookup in the loops over all the pages."""
+    crop_mask = bytearray(num_pages)
+    for p_num in page_nums_to_crop:
+        crop_mask[p_num] = 1
+    return crop_mask
+
 def calculate_crop_list(full_page_box_list, bounding_box_list, angle_list,
                                                                page_nums_to_crop):
     """Given a list of full-page boxes (media boxes) and a list of tight
@@ -299,7 +369,6 @@ def calculate_crop_list(full_page_box_list, bounding_box_list, angle_list,
     # will also be cropped (unless absolute offsets are used to counter that).
 
     num_pages = len(bounding_box_list)
-    page_range = range(num_pages)
     num_pages_to_crop = len(page_nums_to_crop)
 
     # Handle the '--samePageSize' option.
@@ -329,18 +398,15 @@ def calculate_crop_list(full_page_box_list, bounding_box_list, angle_list,
               ]
         same_size_bounding_box = [sortlist[order_n] for sortlist in same_size_bounding_box]
 
-        new_full_page_box_list = []
-        for p_num, box in enumerate(full_page_box_list):
-            if p_num not in page_nums_to_crop:
-                new_full_page_box_list.append(box)
-            else:
-                new_full_page_box_list.append(same_size_bounding_box)
-        full_page_box_list = new_full_page_box_list
+        crop_mask = get_page_crop_mask(page_nums_to_crop, num_pages)
+        full_page_box_list = [same_size_bounding_box if crop_mask[p_num]
+                              else box for p_num, box in enumerate(full_page_box_list)]
 
     # Handle the '--evenodd' option if it was selected.
     if args.evenodd:
-        even_page_nums_to_crop = {p_num for p_num in page_nums_to_crop if p_num % 2 == 0}
-        odd_page_nums_to_crop = {p_num for p_num in page_nums_to_crop if p_num % 2 != 0}
+        # Split using the builtin set operations rather than testing each page num.
+        even_page_nums_to_crop = page_nums_to_crop.intersection(range(0, num_pages, 2))
+        odd_page_nums_to_crop = page_nums_to_crop - even_page_nums_to_crop
 
         if args.uniform:
             uniform_set_with_even_odd = True
@@ -357,20 +423,16 @@ def calculate_crop_list(full_page_box_list, bounding_box_list, angle_list,
         odd_crop_list = calculate_crop_list(full_page_box_list, bounding_box_list,
                                             angle_list, odd_page_nums_to_crop)
 
-        # Recombine the even and odd pages.
-        combine_even_odd = []
-        for p_num in page_range:
-            if p_num % 2 == 0:
-                combine_even_odd.append(even_crop_list[p_num])
-            else:
-                combine_even_odd.append(odd_crop_list[p_num])
+        # Recombine the even and odd pages.  Slice assignment interleaves the two
+        # lists, taking even pages from even_crop_list and odd from odd_crop_list.
+        combine_even_odd = list(odd_crop_list)
+        combine_even_odd[::2] = even_crop_list[::2]
 
         # Handle the case where --uniform was set with --evenodd.
         if uniform_set_with_even_odd:
-            min_bottom_margin = min(box[1] for p_num, box in enumerate(combine_even_odd)
-                                                          if p_num in page_nums_to_crop)
-            max_top_margin = max(box[3] for p_num, box in enumerate(combine_even_odd)
-                                                       if p_num in page_nums_to_crop)
+            cropped_boxes = [combine_even_odd[p_num] for p_num in page_nums_to_crop]
+            min_bottom_margin = min(box[1] for box in cropped_boxes)
+            max_top_margin = max(box[3] for box in cropped_boxes)
             combine_even_odd = [[box[0], min_bottom_margin, box[2], max_top_margin]
                               for box in combine_even_odd]
         return combine_even_odd
@@ -378,11 +440,15 @@ def calculate_crop_list(full_page_box_list, bounding_box_list, angle_list,
     # Before calculating the crops we modify the percentRetain and
     # absoluteOffset values for all the pages according to any specified.
     # rotations for the pages.  This is so, for example, uniform cropping is
-    # relative to what the user actually sees.
-    rotated_percent_retain = [mod_box_for_rotation(args.percentRetain4, angle_list[m_val])
-                                                         for m_val in range(num_pages)]
-    rotated_absolute_offset = [mod_box_for_rotation(args.absoluteOffset4, angle_list[m_val])
-                                                         for m_val in range(num_pages)]
+    # relative to what the user actually sees.  The percentRetain values are
+    # first converted to the factors which scale the deltas.  There are only
+    # four possible rotations, so the values are computed once per rotation
+    # angle rather than once per page.
+    retain_scales = [(100.0 - pct) / 100.0 for pct in args.percentRetain4]
+    rotated_retain_scales = {angle: mod_box_for_rotation(retain_scales, angle)
+                             for angle in set(angle_list)}
+    rotated_absolute_offsets = {angle: mod_box_for_rotation(args.absoluteOffset4, angle)
+                                for angle in set(angle_list)}
 
     # Calculate the list of deltas to be used to modify the original page
     # sizes.  Basically, a delta is the absolute diff between the full and
@@ -392,14 +458,13 @@ def calculate_crop_list(full_page_box_list, bounding_box_list, angle_list,
     # The deltas are all positive unless absoluteOffset changes that or
     # percent>100.  They are added (lb) or subtracted (tr) as appropriate.
 
-    delta_list = []
-    for p_num, t_box, f_box in zip(list(range(len(full_page_box_list))),
-                                               bounding_box_list, full_page_box_list):
-        deltas = [abs(t_box[m_val] - f_box[m_val]) for m_val in range(4)]
-        adj_deltas = [deltas[m_val] * (100.0-rotated_percent_retain[p_num][m_val]) / 100.0
-                     for m_val in range(4)]
-        adj_deltas = [adj_deltas[m_val] + rotated_absolute_offset[p_num][m_val] for m_val in range(4)]
-        delta_list.append(adj_deltas)
+    # Each margin is handled in a single pass over the zipped per-page values,
+    # rather than in separate loops for the deltas, scalings, and offsets.
+    delta_list = [[abs(t - f) * scale + off
+                   for t, f, scale, off in zip(t_box, f_box, rotated_retain_scales[angle],
+                                               rotated_absolute_offsets[angle])]
+                  for t_box, f_box, angle in zip(bounding_box_list, full_page_box_list,
+                                                 angle_list)]
 
     # Handle the '--uniform' options if one was selected.
     if args.uniformOrderPercent:
@@ -411,12 +476,9 @@ def calculate_crop_list(full_page_box_list, bounding_box_list, angle_list,
     if args.uniform or args.uniformOrderStat4:
         if args.verbose:
             print("\nAll the selected pages will be uniformly cropped.")
-        # Expand to tuples containing page nums, to better print verbose information.
-        delta_list = [(delta_list[j], j+1) for j in page_range] # Note +1 added here.
-
         # Only look at the deltas which correspond to pages selected for cropping.
-        # The values will then be sorted for each margin and selected.
-        crop_delta_list = [delta_list[j] for j in page_range if j in page_nums_to_crop]
+        # The values will then be ordered for each margin and selected.
+        crop_page_nums = sorted(page_nums_to_crop)
 
         # Handle order stats; m_vals are the four index values into the sorted
         # delta lists, one per margin.
@@ -439,17 +501,17 @@ def calculate_crop_list(full_page_box_list, bounding_box_list, angle_list,
                   "smallest delta values over the selected pages\nwill be ignored"
                   " when choosing common, uniform delta values.")
 
-        # Get a sorted list of (delta, page_num) tuples for each margin.
-        left_vals = sorted([(box[0][0], box[1]) for box in crop_delta_list])
-        lower_vals = sorted([(box[0][1], box[1]) for box in crop_delta_list])
-        right_vals = sorted([(box[0][2], box[1]) for box in crop_delta_list])
-        upper_vals = sorted([(box[0][3], box[1]) for box in crop_delta_list])
-        delta_list = [[left_vals[m_vals[0]][0], lower_vals[m_vals[1]][0],
-                      right_vals[m_vals[2]][0], upper_vals[m_vals[3]][0]]] * num_pages
+        # Select the (delta, page_num) tuple with the chosen order statistic for
+        # each margin.  Only the smallest m_val+1 values are needed, so a partial
+        # selection is used instead of fully sorting the deltas for each margin.
+        # Note +1 added to the page nums here, to better print verbose information.
+        selected_vals = [heapq.nsmallest(m_vals[m] + 1, ((delta_list[j][m], j+1)
+                                                         for j in crop_page_nums))[-1]
+                         for m in range(4)]
+        delta_list = [[val[0] for val in selected_vals]] * num_pages
 
         if args.verbose:
-            delta_page_nums = [left_vals[m_vals[0]][1], lower_vals[m_vals[1]][1],
-                               right_vals[m_vals[2]][1], upper_vals[m_vals[3]][1]]
+            delta_page_nums = [val[1] for val in selected_vals]
             print("\nThe smallest delta values actually used to set the uniform"
                   " cropping\namounts (ignoring any '-m' skips and pages in ranges"
                   " not cropped) were\nfound on these pages, numbered from 1:\n   ",
@@ -457,10 +519,9 @@ def calculate_crop_list(full_page_box_list, bounding_box_list, angle_list,
             print("\nThe final delta values themselves are:\n   ", delta_list[0])
 
     # Apply the delta modifications to the full boxes to get the final sizes.
-    final_crop_list = []
-    for f_box, deltas in zip(full_page_box_list, delta_list):
-        final_crop_list.append((f_box[0] + deltas[0], f_box[1] + deltas[1],
-                                f_box[2] - deltas[2], f_box[3] - deltas[3]))
+    final_crop_list = [(f_box[0] + deltas[0], f_box[1] + deltas[1],
+                        f_box[2] - deltas[2], f_box[3] - deltas[3])
+                       for f_box, deltas in zip(full_page_box_list, delta_list)]
 
     # Set the page ratios if user chose that option.
     if args.setPageRatios:
@@ -470,9 +531,10 @@ def calculate_crop_list(full_page_box_list, bounding_box_list, angle_list,
             print("\nSetting all page width to height ratios to:", ratio)
             print("The weights per margin are:",
                     left_weight, bottom_weight, right_weight, top_weight)
+        crop_mask = get_page_crop_mask(page_nums_to_crop, num_pages)
         ratio_set_crop_list = []
         for pnum, (left, bottom, right, top) in enumerate(final_crop_list):
-            if pnum not in page_nums_to_crop:
+            if not crop_mask[pnum]:
                 ratio_set_crop_list.append((left, bottom, right, top))
                 continue
             # Pad out left/right or top/bottom margins; padding amount is scaled.
@@ -499,6 +561,57 @@ def calculate_crop_list(full_page_box_list, bounding_box_list, angle_list,
 
     return final_crop_list
 
+class MetadataInfo(object):
+    """Holds metadata values in the same attribute format as the document info
+    object from pyPdf.  This just holds data temporarily; it is not sent into
+    PyPDF2."""
+    def __init__(self, author="", creator="", producer="", subject="", title=""):
+        self.author = author
+        self.creator = creator
+        self.producer = producer
+        self.subject = subject
+        self.title = title
+
+def print_metadata_info(metadata_info):
+    """Print out the metadata of the input document, for verbose mode."""
+    if not metadata_info:
+        print("\nNo readable metadata in the document.")
+        return
+    try:
+        print("\nThe document's metadata, if set:\n")
+        print("   The Author attribute set in the input document is:\n      %s"
+              % (metadata_info.author))
+        print("   The Creator attribute set in the input document is:\n      %s"
+              % (metadata_info.creator))
+        print("   The Producer attribute set in the input document is:\n      %s"
+              % (metadata_info.producer))
+        print("   The Subject attribute set in the input document is:\n      %s"
+              % (metadata_info.subject))
+        print("   The Title attribute set in the input document is:\n      %s"
+              % (metadata_info.title))
+    # Some metadata cannot be decoded or encoded, at least on Windows.  Could
+    # print from a function instead to write all the lines which can be written.
+    except (UnicodeDecodeError, UnicodeEncodeError):
+        print("\nWarning: Could not write all the document's metadata to the screen."
+              "\nGot a UnicodeEncodeError or a UnicodeDecodeError.", file=sys.stderr)
+
+def get_producer_modifier(metadata_info):
+    """Check the Producer metadata attribute to see if this program cropped the
+    document before.  Returns the string to append to the Producer string and a
+    boolean for whether the document was already cropped by this program."""
+    producer_mod = PRODUCER_MODIFIER
+    old_producer_string = metadata_info.producer
+    if old_producer_string and old_producer_string.endswith(producer_mod):
+        producer_mod = "" # No need to pile up suffixes each time on Producer.
+        if args.verbose:
+            print("\nThe document was already cropped at least once by pdfCropMargins.")
+        already_cropped_by_this_program = True
+    else:
+        already_cropped_by_this_program = False
+        if args.verbose:
+            print("\nThe document was not previously cropped by pdfCropMargins.")
+    return producer_mod, already_cropped_by_this_program
+
 def set_cropped_metadata(input_doc, output_doc, metadata_info):
     """Set the metadata for the output document.  Mostly just copied over, but
     "Producer" has a string appended to indicate that this program modified the
@@ -508,51 +621,26 @@ def set_cropped_metadata(input_doc, output_doc, metadata_info):
     # Setting metadata with pyPdf requires low-level pyPdf operations, see
     # http://stackoverflow.com/questions/2574676/change-metadata-of-pdf-file-with-pypdf
     if not metadata_info:
-        # In case it's null, just set values to empty strings.  This class just holds
-        # data temporary in the same format; this is not sent into PyPDF2.
-        class MetadataInfo(object):
-            author = ""
-            creator = ""
-            producer = ""
-            subject = ""
-            title = ""
+        # In case it's null, just set values to empty strings.
         metadata_info = MetadataInfo()
 
     output_info_dict = output_doc._info.getObject()
 
-    # Check Producer metadata attribute to see if this program cropped document before.
-    producer_mod = PRODUCER_MODIFIER
-    old_producer_string = metadata_info.producer
-    if old_producer_string and old_producer_string.endswith(producer_mod):
-        producer_mod = "" # No need to pile up suffixes each time on Producer.
-        if args.verbose:
-            print("\nThe document was already cropped at least once by pdfCropMargins.")
-        already_cropped_by_this_program = True
-    else:
-        already_cropped_by_this_program = False
-        if args.verbose:
-            print("\nThe document was not previously cropped by pdfCropMargins.")
+    producer_mod, already_cropped_by_this_program = get_producer_modifier(metadata_info)
 
     # Note that all None metadata attributes are currently set to the empty string
     # when passing along the metadata information.
-    def st(item):
-        if item is None: return ""
-        else: return item
-
-    output_info_dict.update({
-          NameObject("/Author"): createStringObject(st(metadata_info.author)),
-          NameObject("/Creator"): createStringObject(st(metadata_info.creator)),
-          NameObject("/Producer"): createStringObject(st(metadata_info.producer)
-                                                                 + producer_mod),
-          NameObject("/Subject"): createStringObject(st(metadata_info.subject)),
-          NameObject("/Title"): createStringObject(st(metadata_info.title))
-          })
+    output_info_dict.update({key: createStringObject(getattr(metadata_info, attr) or "")
+                             for key, attr in METADATA_KEYS})
+    output_info_dict[PRODUCER_KEY] = createStringObject(
+                                        (metadata_info.producer or "") + producer_mod)
 
     return already_cropped_by_this_program
 
-def apply_crop_list(crop_list, input_doc, page_nums_to_crop,
-                                          already_cropped_by_this_program):
-    """Apply the crop list to the pages of the input PdfFileReader object."""
+def apply_crop_list(crop_list, input_doc_pages, page_nums_to_crop,
+                                                already_cropped_by_this_program):
+    """Apply the crop list to the pages of the input PdfFileReader object, passed
+    in as the list of its page objects."""
 
     if args.restore and not already_cropped_by_this_program:
         print("\nWarning from pdfCropMargins: The Producer string indicates that"
@@ -571,10 +659,10 @@ def apply_crop_list(crop_list, input_doc, page_nums_to_crop,
         args.writeCropDataToFile = os.path.expanduser(args.writeCropDataToFile)
         f = open(args.writeCropDataToFile, "w")
 
-    # Copy over each page, after modifying the appropriate PDF boxes.
-    for page_num in range(input_doc.getNumPages()):
+    crop_mask = get_page_crop_mask(page_nums_to_crop, len(input_doc_pages))
 
-        curr_page = input_doc.getPage(page_num)
+    # Copy over each page, after modifying the appropriate PDF boxes.
+    for page_num, curr_page in enumerate(input_doc_pages):
 
         # Restore any rotation which was originally on the page.
         curr_page.rotateClockwise(curr_page.rotationAngle)
@@ -590,7 +678,10 @@ def apply_crop_list(crop_list, input_doc, page_nums_to_crop,
             curr_page.cropBox = curr_page.artBox
             continue
 
-        # Do the save to ArtBox if that option is chosen and Producer is set.
+        page_is_cropped = crop_mask[page_num]
+
+        # Do the save to ArtBox if that option is chosen and Producer is set.  This
+        # is done for every page, since later crops of the document do not save it.
         if not args.noundosave and not already_cropped_by_this_program:
             curr_page.artBox = intersect_boxes(curr_page.mediaBox, curr_page.cropBox)
 
@@ -601,10 +692,12 @@ def apply_crop_list(crop_list, input_doc, page_nums_to_crop,
 
         # Copy the original page without further mods if it wasn't in the range
         # selected for cropping.
-        if page_num not in page_nums_to_crop:
+        if not page_is_cropped:
             continue
 
         # Convert the computed "box to crop to" into a RectangleObject (for pyPdf).
+        # The pyPdf box setters store the object itself, without copying, so the
+        # one RectangleObject is shared by all the boxes set below.
         new_cropped_box = RectangleObject(crop_list[page_num])
 
         if args.verbose:
@@ -612,9 +705,6 @@ def apply_crop_list(crop_list, input_doc, page_nums_to_crop,
         if args.writeCropDataToFile:
             print("\t"+str(page_num+1)+"\t", new_cropped_box, file=f)
 
-        if not args.boxesToSet:
-            args.boxesToSet = ["m", "c"]
-
         # Now set any boxes which were selected to be set via the --boxesToSet option.
         if "m" in args.boxesToSet: curr_page.mediaBox = new_cropped_box
         if "c" in args.boxesToSet: curr_page.cropBox = new_cropped_box
@@ -626,9 +716,11 @@ def apply_crop_list(crop_list, input_doc, page_nums_to_crop,
         f.close()
         ex.cleanup_and_exit(0)
 
-def setup_output_document(input_doc, tmp_input_doc, metadata_info,
-                                                    copy_document_catalog=True):
-    """Create the output `PdfFileWriter` objects and copy over the relevant info."""
+def setup_output_document(input_doc, tmp_input_doc, input_doc_pages,
+                          tmp_input_doc_pages, metadata_info,
+                          copy_document_catalog=True):
+    """Create the output `PdfFileWriter` objects and copy over the relevant info.
+    The page lists are the already-fetched page objects of the two documents."""
     # NOTE: Inserting pages from a PdfFileReader into multiple PdfFileWriters
     # seems to cause problems (writer can hang on write), so only one is used.
     # This is why the tmp_input_doc file was created earlier, to get copies of
@@ -735,12 +827,12 @@ def setup_output_document(input_doc, tmp_input_doc, metadata_info,
             output_doc = PdfFileWriter()
 
     #output_doc.appendPagesFromReader(input_doc) # Works, but wait and test more.
-    for page in [input_doc.getPage(i) for i in range(input_doc.getNumPages())]:
+    for page in input_doc_pages:
         output_doc.addPage(page)
 
     tmp_output_doc = PdfFileWriter()
     #tmp_output_doc.appendPagesFromReader(tmp_input_doc)  # Works, but test more.
-    for page in [tmp_input_doc.getPage(i) for i in range(tmp_input_doc.getNumPages())]:
+    for page in tmp_input_doc_pages:
         tmp_output_doc.addPage(page)
 
     ##
@@ -754,6 +846,198 @@ def setup_output_document(input_doc, tmp_input_doc, metadata_info,
     return output_doc, tmp_output_doc, already_cropped_by_this_program
 
 
+##
+## Functions for the PyMuPDF backend, selected with the '--backend mupdf' option.
+##
+
+# The PDF names of the boxes selected by the letters in options like '--boxesToSet'.
+PDF_BOX_NAMES = {"m": "MediaBox", "c": "CropBox", "t": "TrimBox", "a": "ArtBox",
+                 "b": "BleedBox"}
+
+def import_fitz():
+    """Import and return the `fitz` module of PyMuPDF, exiting with an error
+    message if a recent enough version is not installed."""
+    try:
+        try:
+            import pymupdf as fitz # The newer name, which avoids a deprecation warning.
+        except ImportError:
+            import fitz
+        if not list(map(int, fitz.VersionBind.split(".")[:3])) >= [1, 19, 6]:
+            raise ImportError
+    except ImportError:
+        print("\nError in pdfCropMargins: The '--backend mupdf' option requires"
+              "\nPyMuPDF at least v1.19.6.  If installing via pip, use:"
+              "\n   pip install PyMuPDF --upgrade --user", file=sys.stderr)
+        ex.cleanup_and_exit(1)
+    return fitz
+
+def open_document_mupdf(fitz, doc_data):
+    """Open the PDF file contents in the bytes object `doc_data` with PyMuPDF,
+    decrypting it if necessary, and return the `fitz.Document` object."""
+    try:
+        doc = fitz.open(stream=doc_data, filetype="pdf")
+        if not doc.is_pdf:
+            raise ValueError
+    except (KeyboardInterrupt, EOFError):
+        raise
+    except: # Can raise various exceptions, just catch the rest here.
+        print("\nError in pdfCropMargins: The PyMuPDF module failed in an attempt"
+              "\nto read the input file.  Is the file a PDF file?  If so then it"
+              "\nmay be corrupted.  If you have Ghostscript installed you can"
+              "\nattempt to fix it by using the pdfCropMargins option '--gsFix'"
+              "\n(assuming you are not using that option already).", file=sys.stderr)
+        ex.cleanup_and_exit(1)
+
+    # Decrypting with an empty password is tried when no password is set.
+    if doc.needs_pass and not doc.authenticate(args.password if args.password else ""):
+        if args.password:
+            print("\nDecrypting with the password from the '--password' option"
+                  "\nfailed.", file=sys.stderr)
+        else:
+            print("\nError in pdfCropMargins: The document is encrypted.  Use the"
+                  "\n'--password' option to pass in the password.", file=sys.stderr)
+        ex.cleanup_and_exit(1)
+    return doc
+
+def get_box_mupdf(page, box_string):
+    """Return the box of a PyMuPDF page selected by the letter `box_string` as a
+    list in the PDF (lbrt) format.  PyMuPDF returns the MediaBox unchanged, but
+    the other boxes are flipped in y relative to the top of the MediaBox, so
+    the flip is undone here."""
+    media_box = page.mediabox
+    if box_string == "m":
+        return [media_box.x0, media_box.y0, media_box.x1, media_box.y1]
+    box = getattr(page, PDF_BOX_NAMES[box_string].lower())
+    return [box.x0, media_box.y1 - box.y1, box.x1, media_box.y1 - box.y0]
+
+def set_box_mupdf(doc, page, box_string, box):
+    """Set the box of a PyMuPDF page selected by the letter `box_string` to the
+    PDF (lbrt) format `box`.  The page dictionary is written directly since the
+    box-setting methods of PyMuPDF require the boxes to be inside the MediaBox,
+    which is not true when margins are increased."""
+    doc.xref_set_key(page.xref, PDF_BOX_NAMES[box_string],
+                     "[{:.4f} {:.4f} {:.4f} {:.4f}]".format(*box))
+
+def get_full_page_box_list_mupdf(doc):
+    """Get a list of all the full-page box values for each page of the PyMuPDF
+    document `doc`, along with the list of page rotations.  This is the PyMuPDF
+    version of `get_full_page_box_list_assigning_media_and_crop`, except that
+    the pages of the document are not modified."""
+    full_page_box_list = []
+    rotation_list = []
+
+    if args.verbose:
+        print("\nOriginal full page sizes, in PDF format (lbrt):")
+
+    for page_num, page in enumerate(doc):
+        rotation = page.rotation # PyMuPDF always returns 0, 90, 180, or 270.
+
+        # Take the intersection over all chosen boxes.
+        full_box = get_box_mupdf(page, args.fullPageBox[0])
+        for box_string in args.fullPageBox[1:]:
+            full_box = intersect_lbrt_boxes(full_box, get_box_mupdf(page, box_string))
+        full_box = apply_absolute_precrop(full_box, rotation)
+
+        if args.verbose:
+            # want to display page num numbering from 1, so add one
+            print("\t"+str(page_num+1), "  rot =", rotation, "\t", full_box)
+
+        full_page_box_list.append(full_box)
+        rotation_list.append(rotation)
+
+    return full_page_box_list, rotation_list
+
+def write_full_page_box_doc_mupdf(doc, full_page_box_list, doc_fname):
+    """Set the MediaBox and CropBox of each page of the PyMuPDF document `doc` to
+    its full-page box, with any rotation removed, and save the document to the
+    file `doc_fname`.  The file is only used for calculating bounding boxes."""
+    for page, full_box in zip(doc, full_page_box_list):
+        page.set_rotation(0)
+        set_box_mupdf(doc, page, "m", full_box)
+        set_box_mupdf(doc, page, "c", full_box)
+    doc.save(doc_fname)
+
+def set_cropped_metadata_mupdf(doc, metadata_info):
+    """The PyMuPDF version of `set_cropped_metadata`.  The metadata is kept in the
+    document itself, so only the Producer string needs to be modified."""
+    if not metadata_info:
+        metadata_info = MetadataInfo()
+
+    producer_mod, already_cropped_by_this_program = get_producer_modifier(metadata_info)
+
+    if producer_mod:
+        # The "format" and "encryption" entries are informational, not metadata.
+        metadata = {key: value for key, value in doc.metadata.items()
+                    if key not in ("format", "encryption")}
+        metadata["producer"] = (metadata_info.producer or "") + producer_mod
+        doc.set_metadata(metadata)
+
+    return already_cropped_by_this_program
+
+def apply_crop_list_mupdf(crop_list, doc, full_page_box_list, page_nums_to_crop,
+                          already_cropped_by_this_program):
+    """Apply the crop list to the pages of the PyMuPDF document `doc`.  This is
+    the PyMuPDF version of `apply_crop_list`.  The full-page boxes are passed in
+    since they are what is saved in the ArtBox for undoing the crop."""
+
+    if args.restore and not already_cropped_by_this_program:
+        print("\nWarning from pdfCropMargins: The Producer string indicates that"
+              "\neither this document was not previously cropped by pdfCropMargins"
+              "\nor else it was modified by another program after that.  Ignoring the"
+              "\nrestore operation.", file=sys.stderr)
+        return
+
+    if args.verbose:
+        if args.restore:
+            print("\nRestoring the document to margins saved for each page in the ArtBox.")
+        else:
+            print("\nNew full page sizes after cropping, in PDF format (lbrt):")
+
+    if args.writeCropDataToFile:
+        args.writeCropDataToFile = os.path.expanduser(args.writeCropDataToFile)
+        f = open(args.writeCropDataToFile, "w")
+
+    crop_mask = get_page_crop_mask(page_nums_to_crop, len(doc))
+
+    for page_num, page in enumerate(doc):
+
+        # Only do the restore from ArtBox if '--restore' option was selected.
+        if args.restore:
+            if doc.xref_get_key(page.xref, "ArtBox")[0] == "null":
+                print("\nWarning from pdfCropMargins: Attempting to restore pages from"
+                      "\nthe ArtBox in each page, but page", page_num, "has no readable"
+                      "\nArtBox.  Leaving that page unchanged.", file=sys.stderr)
+                continue
+            art_box = get_box_mupdf(page, "a")
+            set_box_mupdf(doc, page, "m", art_box)
+            set_box_mupdf(doc, page, "c", art_box)
+            continue
+
+        # Do the save to ArtBox if that option is chosen and Producer is set.  This
+        # is done for every page, since later crops of the document do not save it.
+        if not args.noundosave and not already_cropped_by_this_program:
+            set_box_mupdf(doc, page, "a", full_page_box_list[page_num])
+
+        # Leave the page unchanged if it wasn't in the range selected for cropping.
+        if not crop_mask[page_num]:
+            continue
+
+        new_cropped_box = crop_list[page_num]
+
+        if args.verbose:
+            print("\t"+str(page_num+1)+"\t", new_cropped_box) # page numbering from 1
+        if args.writeCropDataToFile:
+            print("\t"+str(page_num+1)+"\t", new_cropped_box, file=f)
+
+        # Now set any boxes which were selected to be set via the --boxesToSet option.
+        for box_string in args.boxesToSet:
+            set_box_mupdf(doc, page, box_string, new_cropped_box)
+
+    if args.writeCropDataToFile:
+        f.close()
+        ex.cleanup_and_exit(0)
+
+
 ##############################################################################
 #
 # Begin the main script.
@@ -879,6 +1163,9 @@ def process_command_line_arguments(parsed_args):
     elif not args.fullPageBox:
         args.fullPageBox = ["m", "c"] # usual default
 
+    if not args.boxesToSet:
+        args.boxesToSet = ["m", "c"] # usual default
+
     if args.verbose:
         print("\nFor the full page size, using values from the PDF box"
               "\nspecified by the intersection of these boxes:", args.fullPageBox)
@@ -961,6 +1248,10 @@ def process_pdf_file(input_doc_fname, fixed_input_doc_fname, output_doc_fname,
     that list is used.
 
     The function returns the bounding box list."""
+    if args.backend == "mupdf":
+        return process_pdf_file_mupdf(input_doc_fname, fixed_input_doc_fname,
+                                      output_doc_fname, bounding_box_list)
+
     ##
     ## Open the input document in a PdfFileReader object.  Due to an apparent bug
     ## in pyPdf we open two PdfFileReader objects for the file.  The time required
@@ -971,11 +1262,13 @@ def process_pdf_file(input_doc_fname, fixed_input_doc_fname, output_doc_fname,
     ## to write the same PdfFileWriter to a different file.
     ##
 
-    # Open the input file object.
+    # Open the input file object.  The file is read into memory all at once,
+    # since pyPdf does very many small reads and seeks when parsing a PDF.
     try:
-        fixed_input_doc_file_object = open(fixed_input_doc_fname, "rb")
+        with open(fixed_input_doc_fname, "rb") as fixed_input_doc_file:
+            fixed_input_doc_file_object = io.BytesIO(fixed_input_doc_file.read())
     except IOError:
-        print("Error in pdfCropMargins: Could not open output document with "
+        print("Error in pdfCropMargins: Could not open input document with "
               "filename '{}'".format(fixed_input_doc_fname))
         ex.cleanup_and_exit(1)
 
@@ -1014,12 +1307,21 @@ def process_pdf_file(input_doc_fname, fixed_input_doc_fname, output_doc_fname,
         except KeyError:
             pass # Document apparently wasn't encrypted with an empty password.
 
+    ##
+    ## Get the page objects once, so they are not looked up again for each use.
+    ##
+
+    input_doc_pages = [input_doc.getPage(i) for i in range(input_doc.getNumPages())]
+    tmp_input_doc_pages = [tmp_input_doc.getPage(i)
+                           for i in range(tmp_input_doc.getNumPages())]
+    num_pages = len(input_doc_pages)
+
     ##
     ## Print out some data and metadata in verbose mode.
     ##
 
     if args.verbose:
-        print("\nThe input document has %s pages." % input_doc.getNumPages())
+        print("\nThe input document has %s pages." % num_pages)
 
     try: # This is needed because the call sometimes just raises an error.
         metadata_info = input_doc.getDocumentInfo()
@@ -1027,26 +1329,8 @@ def process_pdf_file(input_doc_fname, fixed_input_doc_fname, output_doc_fname,
         print("\nWarning: Document metadata could not be read.", file=sys.stderr)
         metadata_info = None
 
-    if args.verbose and not metadata_info:
-        print("\nNo readable metadata in the document.")
-    elif args.verbose:
-        try:
-            print("\nThe document's metadata, if set:\n")
-            print("   The Author attribute set in the input document is:\n      %s"
-                  % (metadata_info.author))
-            print("   The Creator attribute set in the input document is:\n      %s"
-                  % (metadata_info.creator))
-            print("   The Producer attribute set in the input document is:\n      %s"
-                  % (metadata_info.producer))
-            print("   The Subject attribute set in the input document is:\n      %s"
-                  % (metadata_info.subject))
-            print("   The Title attribute set in the input document is:\n      %s"
-                  % (metadata_info.title))
-        # Some metadata cannot be decoded or encoded, at least on Windows.  Could
-        # print from a function instead to write all the lines which can be written.
-        except (UnicodeDecodeError, UnicodeEncodeError):
-            print("\nWarning: Could not write all the document's metadata to the screen."
-                  "\nGot a UnicodeEncodeError or a UnicodeDecodeError.", file=sys.stderr)
+    if args.verbose:
+        print_metadata_info(metadata_info)
 
     ##
     ## Now compute the set containing the pyPdf page number of all the pages
@@ -1059,31 +1343,7 @@ def process_pdf_file(input_doc_fname, fixed_input_doc_fname, output_doc_fname,
     ## pages which were not selected.
     ##
 
-    all_page_nums = set(range(0, input_doc.getNumPages()))
-    if args.pages:
-        try:
-            page_nums_to_crop = parse_page_range_specifiers(args.pages, all_page_nums)
-        except ValueError:
-            print(
-                "\nError in pdfCropMargins: The page range specified on the command",
-                "\nline contains a non-integer value or otherwise cannot be parsed.",
-                file=sys.stderr)
-            ex.cleanup_and_exit(1)
-    else:
-        page_nums_to_crop = all_page_nums
-
-    # In verbose mode print out information about the pages to crop.
-    if args.verbose and args.pages:
-        print("\nThese pages of the document will be cropped:", end="")
-        p_num_list = sorted(list(page_nums_to_crop))
-        num_pages_to_crop = len(p_num_list)
-        for i in range(num_pages_to_crop):
-            if i % 10 == 0 and i != num_pages_to_crop - 1:
-                print("\n   ", end="")
-            print("%5d" % (p_num_list[i]+1), " ", end="")
-        print()
-    elif args.verbose:
-        print("\nAll the pages of the document will be cropped.")
+    page_nums_to_crop = get_page_nums_to_crop(num_pages)
 
     ##
     ## Get a list with the full-page boxes for each page: (left,bottom,right,top)
@@ -1092,17 +1352,18 @@ def process_pdf_file(input_doc_fname, fixed_input_doc_fname, output_doc_fname,
     ##
 
     full_page_box_list, rotation_list = get_full_page_box_list_assigning_media_and_crop(
-                                                          input_doc, skip_pre_crop=False)
+                                                    input_doc_pages, skip_pre_crop=False)
     # Below return values aren't used, but function has side-effects on tmp_input_doc.
     tmp_full_page_box_list, tmp_rotation_list = get_full_page_box_list_assigning_media_and_crop(
-                                            tmp_input_doc, quiet=True, skip_pre_crop=False)
+                                    tmp_input_doc_pages, quiet=True, skip_pre_crop=False)
 
     ##
     ## Define a PdfFileWriter object and copy input_doc info over to it.
     ##
 
     output_doc, tmp_output_doc, already_cropped_by_this_program = setup_output_document(
-                                                   input_doc, tmp_input_doc, metadata_info)
+                                             input_doc, tmp_input_doc, input_doc_pages,
+                                             tmp_input_doc_pages, metadata_info)
 
     ##
     ## Write out the PDF document again, with the CropBox and MediaBox reset.
@@ -1114,7 +1375,7 @@ def process_pdf_file(input_doc_fname, fixed_input_doc_fname, output_doc_fname,
 
     if not bounding_box_list and not args.restore:
         doc_with_crop_and_media_boxes_name = ex.get_temporary_filename(".pdf")
-        with open(doc_with_crop_and_media_boxes_name, "wb"
+        with open(doc_with_crop_and_media_boxes_name, "wb", WRITE_BUFFER_SIZE
                                           ) as doc_with_crop_and_media_boxes_object:
             if args.verbose:
                 print("\nWriting out the PDF with the CropBox and MediaBox redefined.")
@@ -1136,7 +1397,7 @@ def process_pdf_file(input_doc_fname, fixed_input_doc_fname, output_doc_fname,
 
     if not bounding_box_list and not args.restore:
         bounding_box_list = get_bounding_box_list(doc_with_crop_and_media_boxes_name,
-                input_doc, full_page_box_list, page_nums_to_crop, args, PdfFileWriter)
+                full_page_box_list, page_nums_to_crop, args, PdfFileWriter)
         if args.verbose:
             print("\nThe bounding boxes are:")
             for pNum, b in enumerate(bounding_box_list):
@@ -1161,8 +1422,8 @@ def process_pdf_file(input_doc_fname, fixed_input_doc_fname, output_doc_fname,
     ## These pages are copied to the PdfFileWriter output_doc.
     ##
 
-    apply_crop_list(crop_list, input_doc, page_nums_to_crop,
-                                          already_cropped_by_this_program)
+    apply_crop_list(crop_list, input_doc_pages, page_nums_to_crop,
+                                                already_cropped_by_this_program)
 
     ##
     ## Write the final PDF out to a file.
@@ -1172,7 +1433,7 @@ def process_pdf_file(input_doc_fname, fixed_input_doc_fname, output_doc_fname,
         print("\nWriting the cropped PDF file.")
 
     try:
-        output_doc_stream = open(output_doc_fname, "wb")
+        output_doc_stream = open(output_doc_fname, "wb", WRITE_BUFFER_SIZE)
     except IOError:
         print("Error in pdfCropMargins: Could not open output document with "
               "filename '{}'".format(output_doc_fname))
@@ -1189,9 +1450,10 @@ def process_pdf_file(input_doc_fname, fixed_input_doc_fname, output_doc_fname,
             # a new output_doc without that data and try the write again.
             print("\nWrite failure, trying one more time...", file=sys.stderr)
             output_doc_stream.close()
-            output_doc_stream = open(output_doc_fname, "wb")
+            output_doc_stream = open(output_doc_fname, "wb", WRITE_BUFFER_SIZE)
             output_doc, tmp_output_doc, already_cropped = setup_output_document(
-                    input_doc, tmp_input_doc, metadata_info, copy_document_catalog=False)
+                    input_doc, tmp_input_doc, input_doc_pages, tmp_input_doc_pages,
+                    metadata_info, copy_document_catalog=False)
             output_doc.write(output_doc_stream)
             print("\nWarning: Document catalog data caused a write failure.  A retry"
                   "\nwithout that data succeeded.  No document catalog information was"
@@ -1210,10 +1472,127 @@ def process_pdf_file(input_doc_fname, fixed_input_doc_fname, output_doc_fname,
 
     output_doc_stream.close()
 
-    # We're finished with this open file; close it and let temp dir removal delete it.
+    # We're finished with the in-memory copy of the file; temp dir removal deletes it.
     fixed_input_doc_file_object.close()
     return bounding_box_list
 
+def process_pdf_file_mupdf(input_doc_fname, fixed_input_doc_fname, output_doc_fname,
+                           bounding_box_list=None):
+    """The version of `process_pdf_file` which reads and writes the PDF file with
+    PyMuPDF instead of pyPdf, selected with the '--backend mupdf' option.  The
+    arguments and the return value are the same."""
+    fitz = import_fitz()
+
+    ##
+    ## Open the input document and print out some data and metadata in verbose mode.
+    ## Unlike with pyPdf, only one document object is needed for the output.
+    ##
+
+    # The file is read into memory once, and both document objects are opened
+    # from that copy.
+    try:
+        with open(fixed_input_doc_fname, "rb") as fixed_input_doc_file:
+            fixed_input_doc_data = fixed_input_doc_file.read()
+    except IOError:
+        print("Error in pdfCropMargins: Could not open input document with "
+              "filename '{}'".format(fixed_input_doc_fname))
+        ex.cleanup_and_exit(1)
+
+    input_doc = open_document_mupdf(fitz, fixed_input_doc_data)
+    num_pages = len(input_doc)
+
+    if args.verbose:
+        print("\nThe input document has %s pages." % num_pages)
+
+    metadata = input_doc.metadata
+    if metadata:
+        metadata_info = MetadataInfo(**{key: metadata.get(key) or "" for key in
+                                ("author", "creator", "producer", "subject", "title")})
+    else:
+        metadata_info = None
+
+    if args.verbose:
+        print_metadata_info(metadata_info)
+
+    page_nums_to_crop = get_page_nums_to_crop(num_pages)
+
+    ##
+    ## Get a list with the full-page boxes for each page, and set the metadata.
+    ##
+
+    full_page_box_list, rotation_list = get_full_page_box_list_mupdf(input_doc)
+
+    already_cropped_by_this_program = set_cropped_metadata_mupdf(input_doc,
+                                                                 metadata_info)
+
+    ##
+    ## Write out a temporary PDF with the CropBox and MediaBox reset, and use it to
+    ## calculate the bounding_box_list containing tight page bounds for each page.
+    ##
+
+    if not bounding_box_list and not args.restore:
+        doc_with_crop_and_media_boxes_name = ex.get_temporary_filename(".pdf")
+        if args.verbose:
+            print("\nWriting out the PDF with the CropBox and MediaBox redefined.")
+
+        tmp_input_doc = open_document_mupdf(fitz, fixed_input_doc_data)
+        try:
+            write_full_page_box_doc_mupdf(tmp_input_doc, full_page_box_list,
+                                          doc_with_crop_and_media_boxes_name)
+        except (KeyboardInterrupt, EOFError):
+            raise
+        except: # PyMuPDF can raise various exceptions.
+            print("\nError in pdfCropMargins: The PyMuPDF program failed in trying to"
+                  "\nwrite out a PDF file of the document.  The document may be"
+                  "\ncorrupted.  If you have Ghostscript, try using the '--gsFix'"
+                  "\noption (assuming you are not already using it).", file=sys.stderr)
+            ex.cleanup_and_exit(1)
+        tmp_input_doc.close()
+
+        bounding_box_list = get_bounding_box_list(doc_with_crop_and_media_boxes_name,
+                full_page_box_list, page_nums_to_crop, args, PdfFileWriter)
+        if args.verbose:
+            print("\nThe bounding boxes are:")
+            for pNum, b in enumerate(bounding_box_list):
+                print("\t", pNum+1, "\t", b)
+        os.remove(doc_with_crop_and_media_boxes_name) # No longer needed.
+
+    elif args.verbose and not args.restore:
+        print("\nUsing the bounding box list passed in instead of calculating it.")
+
+    ##
+    ## Calculate the crop_list and apply the crops to the pages of input_doc.
+    ##
+
+    if not args.restore:
+        crop_list = calculate_crop_list(full_page_box_list, bounding_box_list,
+                                        rotation_list, page_nums_to_crop)
+    else:
+        crop_list = None # Restore, not needed in this case.
+
+    apply_crop_list_mupdf(crop_list, input_doc, full_page_box_list, page_nums_to_crop,
+                          already_cropped_by_this_program)
+
+    ##
+    ## Write the final PDF out to a file.
+    ##
+
+    if args.verbose:
+        print("\nWriting the cropped PDF file.")
+
+    try:
+        input_doc.save(output_doc_fname, encryption=fitz.PDF_ENCRYPT_NONE)
+    except (KeyboardInterrupt, EOFError):
+        raise
+    except: # PyMuPDF can raise various exceptions.
+        print("\nError in pdfCropMargins: The PyMuPDF program failed in trying to"
+              "\nwrite out the cropped PDF file.  Could not write document with"
+              "\nfilename '{}'.".format(output_doc_fname), file=sys.stderr)
+        ex.cleanup_and_exit(1)
+
+    input_doc.close()
+    return bounding_box_list
+
 def handle_options_on_cropped_file(input_doc_fname, output_doc_fname):
     """Handle the options which apply after the file is written such as previewing
     and renaming."""
@@ -591,6 +591,18 @@ cmd_parser.add_argument("-gsf", "--gsFix", action="store_true", help="""
    something to use by default unless you encounter many corrupted PDF files
    and do not need to restore back to the original margins.^^n""")
 
+cmd_parser.add_argument("-bk", "--backend", choices=["pypdf", "mupdf"],
+                        default="pypdf", help="""
+
+   Choose the Python package which is used to read, modify, and write the PDF
+   file.  The default "pypdf" uses the PyPDF2 package.  The value "mupdf" uses
+   the PyMuPDF package instead, which is usually much faster on large documents
+   since it is based on the MuPDF C library.  That choice requires PyMuPDF at
+   least v1.19.6 to be installed.  The bounding boxes of the pages are found
+   the same way with either choice.  With "mupdf" the document catalog is always
+   kept unchanged, so the '--docCatBlacklist' and '--docCatWhitelist' options
+   are ignored.^^n""")
+
 cmd_parser.add_argument("-nc", "--noclobber", action="store_true", help="""
 
    Never overwrite an existing file as the output file.^^n""")
@@ -608,8 +620,11 @@ cmd_parser.add_argument("-pv", "--preview", metavar="PROG", help="""
    the executable file or script to run the chosen viewer.  The viewer is
    assumed to take exactly one argument, a PDF filename.  For example, on Linux
    the Acrobat Reader could be chosen with /usr/bin/acroread or, if it is in
-   the PATH, simply acroread.  A shell script or batch file wrapper can be used
-   to set any additional options for the viewer.^^n""")
+   the PATH, simply acroread.  Except on Windows, a PROG which is not the path
+   of an existing file is split into words like a shell command line, so
+   options can be included, as in "evince --fresh".  A shell script or batch
+   file wrapper can also be used to set any additional options for the
+   viewer.^^n""")
 
 cmd_parser.add_argument("-mo", "--modifyOriginal", action="store_true", help="""
 